@@ -6,12 +6,17 @@ from pathlib import Path
 
 import ibm_db_dbi
 import threading
-from queue import Queue, Empty
-from typing import List, Optional, Tuple, Iterator, Set, NamedTuple, Callable, Dict, Any
-from contextlib import contextmanager
+from queue import LifoQueue, Empty, Full
+from typing import Iterable, List, Optional, Tuple, Iterator, Set, NamedTuple, Callable, Dict, Any, Collection, Deque
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager, closing
+from functools import lru_cache, partial
+from itertools import groupby, islice
+from operator import attrgetter, itemgetter
 import time
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
 import logging
 import re
@@ -20,6 +25,8 @@ import yaml
 import argparse
 import psutil
 import os
+import random
+from array import array
 
 
 # Create a module-level logger that will be replaced in main()
@@ -53,10 +60,16 @@ class Config:
     read_batch_size: int
     num_consumers: int
     consumers_queue_size: int
+    page_size: Optional[int]
+    claim_rows: bool
+    tape_workers: int
+    adaptive_batch: bool
+    consumer_ack_batch: int
 
     # DB updater setup
     update_queue_size: int
     update_status: bool
+    update_batch_size: int
 
     # Arsadmin setup
     command_max_objects: int
@@ -65,6 +78,7 @@ class Config:
     password: Optional[str]
     od_inst: str
     base_dir: str
+    command_timeout_seconds: Optional[int]
 
     # Monitoring
     metrics_interval_seconds: int
@@ -89,18 +103,16 @@ class DBRow(NamedTuple):
     agname: str # AGNAME
     object_id: str # LOADID
     pri_nid: int # PRINID
-    status: str # STATUS
-    processed_dt: Optional[datetime] # DTSTAMP
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ObjectRecord:
     """Map object id to db record id"""
     db_record_id: int
     object_id: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Command:
     """Groups objects from the same tape, od_inst, and pri_nid"""
     od_inst: str
@@ -112,34 +124,193 @@ class Command:
     object_records: List[ObjectRecord]
 
 
-@dataclass
+@dataclass(slots=True)
 class CommandResult:
     successful_ids: Set[int]
     failed_ids: Set[int]  # object_name -> error message
 
 
-@dataclass
+@dataclass(slots=True)
 class StatusUpdate:
-    ids: Set[int]
+    ids: Collection[int]  # merged into StatusBuffer's map, so no set is needed
     status: ProcessingStatus
 
 
 @dataclass
 class ProcessingStats:
-    processed_commands: int = 0
-    processed_objects: int = 0
-    last_log_time: float = field(default_factory=time.time)
+    num_slots: int = 1
+    # One [commands, objects] counter pair per consumer slot, summed on read
+    _slots: List[List[int]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._slots = [[0, 0] for _ in range(self.num_slots)]
+
+    def increment(self, slot_id: int, command_object_count: int) -> None:
+        slot = self._slots[slot_id]
+        slot[0] += 1
+        slot[1] += command_object_count
+
+    @property
+    def processed_commands(self) -> int:
+        return sum(slot[0] for slot in self._slots)
+
+    @property
+    def processed_objects(self) -> int:
+        return sum(slot[1] for slot in self._slots)
+
+
+class RingBuffer:
+    """Bounded FIFO of preallocated slots, closed by the producer when done"""
+    def __init__(self, maxsize: int) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+        self.maxsize: int = maxsize
+        # Capacity rounded up to a power of two, slots are indexed with a mask
+        capacity: int = 1 << (maxsize - 1).bit_length()
+        self._mask: int = capacity - 1
+        self._slots: List[Any] = [None] * capacity
+        self._head: int = 0  # next slot to read
+        self._tail: int = 0  # next slot to write
+        self._closed: bool = False
+        self._lock: threading.Lock = threading.Lock()
+        self._not_empty: threading.Condition = threading.Condition(self._lock)
+        self._not_full: threading.Condition = threading.Condition(self._lock)
+
+    def qsize(self) -> int:
+        return self._tail - self._head
+
+    def empty(self) -> bool:
+        return self._tail == self._head
+
+    def full(self) -> bool:
+        return self._tail - self._head >= self.maxsize
+
+    def close(self) -> None:
+        """No more items will be put, wakes consumers once the buffer drains"""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> None:
+        """Append item, raises Full if no slot frees up within timeout"""
+        with self._not_full:
+            if timeout is None:
+                while self._tail - self._head >= self.maxsize:
+                    self._not_full.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while self._tail - self._head >= self.maxsize:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Full
+                    self._not_full.wait(remaining)
+            self._slots[self._tail & self._mask] = item
+            self._tail += 1
+            self._not_empty.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Pop the oldest item, raises Empty on timeout or once closed and drained"""
+        with self._not_empty:
+            if timeout is None:
+                while self._tail == self._head:
+                    if self._closed:
+                        raise Empty
+                    self._not_empty.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while self._tail == self._head:
+                    remaining = deadline - time.monotonic()
+                    if self._closed:
+                        raise Empty
+                    if remaining <= 0:
+                        raise Empty
+                    self._not_empty.wait(remaining)
+            index = self._head & self._mask
+            item = self._slots[index]
+            self._slots[index] = None  # drop the reference so the batch can be freed
+            self._head += 1
+            self._not_full.notify()
+            return item
+
+
+class StatusBuffer:
+    """Pending status changes merged into one id -> status map"""
+    def __init__(self, maxsize: int) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+        self.maxsize: int = maxsize
+        self._status_by_id: Dict[int, str] = {}
+        self._pending_puts: int = 0
+        self._closed: bool = False
+        self._lock: threading.Lock = threading.Lock()
+        self._not_empty: threading.Condition = threading.Condition(self._lock)
+        self._not_full: threading.Condition = threading.Condition(self._lock)
+
+    def qsize(self) -> int:
+        """Hand-overs merged since the last drain()"""
+        return self._pending_puts
+
+    def empty(self) -> bool:
+        return not self._status_by_id
+
+    def full(self) -> bool:
+        return self._pending_puts >= self.maxsize
+
+    def close(self) -> None:
+        """Wakes the reader, drain() stops waiting once the buffer is closed"""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, updates: List[StatusUpdate]) -> None:
+        """Merge updates in order, blocking while maxsize hand-overs are waiting"""
+        with self._not_full:
+            while self._pending_puts >= self.maxsize:
+                self._not_full.wait()
+            for update in updates:
+                self._status_by_id.update(dict.fromkeys(update.ids, update.status.value))
+            self._pending_puts += 1
+            self._not_empty.notify()
+
+    def drain(self, min_ids: int = 1, timeout: Optional[float] = None) -> Dict[int, str]:
+        """Swap out the id -> status map once it holds min_ids ids or timeout expires"""
+        with self._not_empty:
+            deadline: Optional[float] = None if timeout is None else time.monotonic() + timeout
+            while (len(self._status_by_id) < min_ids
+                   and self._pending_puts < self.maxsize
+                   and not self._closed):
+                remaining: Optional[float] = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._not_empty.wait(remaining)
+            status_by_id, self._status_by_id = self._status_by_id, {}
+            self._pending_puts = 0
+            self._not_full.notify_all()
+            return status_by_id
+
+    def requeue(self, status_by_id: Dict[int, str]) -> None:
+        """Merge a drained map back in, newer statuses win and put() waits for the next drain"""
+        with self._not_empty:
+            status_by_id.update(self._status_by_id)
+            self._status_by_id = status_by_id
+            self._pending_puts = self.maxsize
+            self._not_empty.notify()
 
 
 class MetricsMonitor:
     def __init__(
             self,
-            log_interval: float
+            log_interval: float,
+            num_slots: int = 1
     ) -> None:
-        self._queue: Optional[Queue] = None
-        self._update_queue: Optional[Queue] = None
+        self._queue: Optional[RingBuffer] = None
+        self._update_queue: Optional[StatusBuffer] = None
         self.log_interval = log_interval
-        self.stats = ProcessingStats()
+        self.stats = ProcessingStats(num_slots=num_slots)
         self._shutdown_event = threading.Event()
         self._monitor_thread: Optional[threading.Thread] = None
 
@@ -159,40 +330,39 @@ class MetricsMonitor:
         if self._monitor_thread:
             self._monitor_thread.join(timeout=5.0)
 
-    def increment_processed(self, command_object_count: int) -> None:
-        """Increment the processed objects counter"""
-        self.stats.processed_objects += command_object_count
-        self.stats.processed_commands += 1
+    def increment_processed(self, slot_id: int, command_object_count: int) -> None:
+        """Increment the processed counters owned by the calling consumer"""
+        self.stats.increment(slot_id, command_object_count)
 
-    def set_queues(self, queue: Queue, update_queue: Queue) -> None:
+    def set_queues(self, queue: RingBuffer, update_queue: StatusBuffer) -> None:
         """Set the queue to monitor"""
         self._queue = queue
         self._update_queue = update_queue
 
     def _monitor_loop(self) -> None:
         """Main monitoring loop that periodically logs metrics"""
-        while not self._shutdown_event.is_set():
+        while not self._shutdown_event.wait(self.log_interval):
             try:
-                current_time = time.time()
-                if current_time - self.stats.last_log_time >= self.log_interval:
-                    self._log_metrics()
-                    self.stats.last_log_time = current_time
-
-                time.sleep(1.0)  # Avoid tight loop
+                self._log_metrics()
             except Exception as e:
                 logger.error(f"Error in metrics monitor: {e}")
-                time.sleep(5.0)  # Back off on error
 
     def _log_metrics(self) -> None:
         """Log current metrics"""
+        # One snapshot for both log forms
+        queue_size: int = self._queue.qsize()
+        update_queue_size: int = self._update_queue.qsize()
+        processed_commands: int = self.stats.processed_commands
+        processed_objects: int = self.stats.processed_objects
+
         # Log formatted metrics
         log_entries = [
             "-" * 80,
             "Current Processing Metrics:",
-            f"Queue size: {self._queue.qsize()}/{self._queue.maxsize}",
-            f"Update queue size: {self._update_queue.qsize()}/{self._update_queue.maxsize}",
-            f"Commands processed: {self.stats.processed_commands:,}",
-            f"Total objects processed: {self.stats.processed_objects:,}",
+            f"Queue size: {queue_size}/{self._queue.maxsize}",
+            f"Update queue size: {update_queue_size}/{self._update_queue.maxsize}",
+            f"Commands processed: {processed_commands:,}",
+            f"Total objects processed: {processed_objects:,}",
             "-" * 80
         ]
 
@@ -201,15 +371,15 @@ class MetricsMonitor:
 
         # Log metrics as JSON
         metrics_dict = {
-            "queue_size": self._queue.qsize(),
+            "queue_size": queue_size,
             "queue_maxsize": self._queue.maxsize,
-            "update_queue_size": self._update_queue.qsize(),
+            "update_queue_size": update_queue_size,
             "update_queue_maxsize": self._update_queue.maxsize,
-            "commands_processed": self.stats.processed_commands,
-            "total_objects_processed": self.stats.processed_objects,
-            "queue_utilization_percentage": round((self._queue.qsize() / self._queue.maxsize) * 100, 2),
+            "commands_processed": processed_commands,
+            "total_objects_processed": processed_objects,
+            "queue_utilization_percentage": round((queue_size / self._queue.maxsize) * 100, 2),
             "update_queue_utilization_percentage": round(
-                (self._update_queue.qsize() / self._update_queue.maxsize) * 100, 2)
+                (update_queue_size / self._update_queue.maxsize) * 100, 2)
         }
 
         try:
@@ -317,9 +487,13 @@ class RuntimeStatistics:
 class RuntimeStatisticsCalculator:
         """Handles calculation and formatting of processing metrics"""
 
+        SIZE_UNITS: Tuple[str, ...] = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+        # Largest sample kept for the median
+        MEDIAN_SAMPLE_SIZE: int = 100_000
+
         def __init__(self, base_dir: str, interval_seconds: int) -> None:
             self.base_dir: str = base_dir
-            self.start_time: float = time.time()
+            self.start_time: int = time.perf_counter_ns()
             self.interval_seconds: int = interval_seconds
             self._shutdown_event: threading.Event = threading.Event()
             self._monitor_thread: Optional[threading.Thread] = None
@@ -364,14 +538,31 @@ class RuntimeStatisticsCalculator:
             if not path.exists():
                 raise ValueError(f"Directory {self.base_dir} does not exist")
 
-            file_sizes: list[int] = []
-
-            # Walk through all subdirectories
-            for file_path in path.rglob('*'):
-                if file_path.is_file():
-                    file_sizes.append(file_path.stat().st_size)
-
-            if not file_sizes:
+            sample_size: int = self.MEDIAN_SAMPLE_SIZE
+            sample: array = array('q')
+            total_files: int = 0
+            total_size: int = 0
+            min_size: int = 0
+            max_size: int = 0
+
+            # Reservoir sampling (algorithm R) for the median
+            for size in self._iter_file_sizes(self.base_dir):
+                if total_files < sample_size:
+                    sample.append(size)
+                else:
+                    slot = random.randrange(total_files + 1)
+                    if slot < sample_size:
+                        sample[slot] = size
+                if not total_files:
+                    min_size = max_size = size
+                elif size < min_size:
+                    min_size = size
+                elif size > max_size:
+                    max_size = size
+                total_files += 1
+                total_size += size
+
+            if not total_files:
                 return RuntimeStatistics(
                     runtime_seconds=0,
                     total_files=0,
@@ -381,36 +572,44 @@ class RuntimeStatisticsCalculator:
                     max_size_bytes=0
                 )
 
-            runtime = time.time() - self.start_time
+            runtime = (time.perf_counter_ns() - self.start_time) / 1e9
 
             return RuntimeStatistics(
                 runtime_seconds=runtime,
-                total_files=len(file_sizes),
-                total_size_bytes=sum(file_sizes),
-                median_size_bytes=statistics.median(file_sizes),
-                min_size_bytes=min(file_sizes),
-                max_size_bytes=max(file_sizes)
+                total_files=total_files,
+                total_size_bytes=total_size,
+                median_size_bytes=statistics.median(sample),
+                min_size_bytes=min_size,
+                max_size_bytes=max_size
             )
 
+        @staticmethod
+        def _iter_file_sizes(root: str) -> Iterator[int]:
+            """Sizes of all files below root"""
+            directories: List[str] = [root]
+            while directories:
+                with os.scandir(directories.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.path)
+                        elif entry.is_file():
+                            yield entry.stat().st_size
+
         def calculate_and_log_metrics(self) -> None:
             self._log_metrics(self._calculate_metrics())
 
-        @staticmethod
-        def format_size(size_bytes: int) -> str:
+        @classmethod
+        def format_size(cls, size_bytes: int) -> str:
             """Format byte size into human-readable format"""
-            for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-                if size_bytes < 1024.0:
-                    return f"{size_bytes:.2f} {unit}"
-                size_bytes /= 1024.0
-            return f"{size_bytes:.2f} PB"
+            unit: int = min(max(size_bytes.bit_length() - 1, 0) // 10, len(cls.SIZE_UNITS) - 1)
+            return f"{size_bytes / (1 << (10 * unit)):.2f} {cls.SIZE_UNITS[unit]}"
 
         @staticmethod
         def format_runtime(seconds: float) -> str:
             """Format runtime into human-readable format"""
-            delta = timedelta(seconds=seconds)
-            hours = delta.seconds // 3600
-            minutes = (delta.seconds % 3600) // 60
-            seconds = delta.seconds % 60
+            # Hours keep counting past a day
+            hours, remainder = divmod(int(seconds), 3600)
+            minutes, seconds = divmod(remainder, 60)
 
             return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
@@ -473,157 +672,69 @@ class CommandBatchBuilder:
         self.user = user
         self.password = password
         self.od_inst = od_inst
-        self._dir_prefix = base_dir
+        self._dir_prefix = os.path.abspath(base_dir)
         self._current_batch_no: int = 0
+        # Last agid_name/batch_N directory built
+        self._batch_dir_key: Optional[Tuple[str, int]] = None
+        self._batch_dir: str = ''
 
     def _get_subfolder_path(self, agid_name :str):
         command_subdir = self._current_batch_no % self.dir_max_elems
         if command_subdir == 0:
             command_subdir = self.dir_max_elems
-        return os.path.abspath(os.path.join(
-            self._dir_prefix,
-            agid_name,
-            "batch_" + str((self._current_batch_no // self.dir_max_elems) + 1),
-            "command_" + str(command_subdir)
-        ))
-
-    def build_tape_commands(
-        self,
-        rows: List[DBRow]
-    ) -> List[Command]:
-        logger.debug(f"build_tape_commands, Building tape commands for {len(rows)} rows")
-        """
-        Creates TapeCommandBatch objects from rows of a single tape_id.
-        Expects rows to be sorted by: agname, prinid, odcreats
-        """
-        if not rows:
-            return []
-
-        # Verify all rows have the same tape_id
-        tape_id = rows[0].tape_id
-        if not all(r.tape_id == tape_id for r in rows):
-            raise ValueError("All rows must have the same tape_id")
-
-        command_batches: List[Command] = []
-        current_object_records: List[ObjectRecord] = []
-        current_pri_nid: Optional[int] = None
-        current_agname: Optional[str] = None
-        current_agid_name: Optional[str] = None
-
-        for row in rows:
-            # Start new batch if pri_nid changes or max objects reached
-            if (current_pri_nid != row.pri_nid or
-                current_agname != row.agname or
-                len(current_object_records) >= self.max_objects):
-                if current_object_records:
-                    self._current_batch_no += 1
-
-                    command_batches.append(
-                        Command(
-                            od_inst=self.od_inst,
-                            user=self.user,
-                            password=self.password,
-                            agname=current_agname,
-                            pri_nid=current_pri_nid,
-                            dest_subdir=self._get_subfolder_path(current_agid_name),
-                            object_records=current_object_records
-                        )
-                    )
-                current_object_records = []
-                current_pri_nid = row.pri_nid
-                current_agname = row.agname
-                current_agid_name = row.agid_name
-
-            current_object_records.append(ObjectRecord(row.id, row.object_id))
-
-        # Handle last group
-        if current_object_records:
-            self._current_batch_no += 1
-            command_batches.append(
-                Command(
+        batch_key = (agid_name, (self._current_batch_no // self.dir_max_elems) + 1)
+        if batch_key != self._batch_dir_key:
+            self._batch_dir_key = batch_key
+            self._batch_dir = os.path.abspath(os.path.join(self._dir_prefix, agid_name, f"batch_{batch_key[1]}"))
+        return f"{self._batch_dir}{os.sep}command_{command_subdir}"
+
+    def iter_commands(self, rows: Iterable[DBRow]) -> Iterator[Command]:
+        """Yields one Command per max_objects chunk of each (agname, pri_nid) run"""
+        for (agname, pri_nid), group in groupby(rows, key=attrgetter('agname', 'pri_nid')):
+            while chunk := list(islice(group, self.max_objects)):
+                self._current_batch_no += 1
+                yield Command(
                     od_inst=self.od_inst,
                     user=self.user,
                     password=self.password,
-                    agname=current_agname,
-                    pri_nid=current_pri_nid,
-                    dest_subdir=self._get_subfolder_path(current_agid_name),
-                    object_records=current_object_records
+                    agname=agname,
+                    pri_nid=pri_nid,
+                    dest_subdir=self._get_subfolder_path(chunk[0].agid_name),
+                    object_records=[ObjectRecord(row.id, row.object_id) for row in chunk]
                 )
-            )
-
-        return command_batches
 
-    def simple_build_commands(
+    def build_tape_commands(
         self,
         rows: List[DBRow]
     ) -> List[Command]:
         logger.debug(f"build_tape_commands, Building tape commands for {len(rows)} rows")
         """
-        Creates List[Command] without further constraints from all rows.
-        Expects rows to be sorted by: agname, odsloc, odcreats
+        Creates TapeCommandBatch objects from rows of a single tape_id.
+        Expects rows to be sorted by: agname, prinid, odcreats
         """
         if not rows:
             return []
 
-        command_batches: List[Command] = []
-        current_object_records: List[ObjectRecord] = []
-        current_pri_nid: Optional[int] = None
-        current_agname: Optional[str] = None
-        current_agid_name: Optional[str] = None
-
-        for row in rows:
-            # Start new batch if pri_nid changes or max objects reached
-            if (current_pri_nid != row.pri_nid or
-                current_agname != row.agname or
-                len(current_object_records) >= self.max_objects):
-                if current_object_records:
-                    self._current_batch_no += 1
-
-                    command_batches.append(
-                        Command(
-                            od_inst=self.od_inst,
-                            user=self.user,
-                            password=self.password,
-                            agname=current_agname,
-                            pri_nid=current_pri_nid,
-                            dest_subdir=self._get_subfolder_path(current_agid_name),
-                            object_records=current_object_records
-                        )
-                    )
-                current_object_records = []
-                current_pri_nid = row.pri_nid
-                current_agname = row.agname
-                current_agid_name = row.agid_name
-
-            current_object_records.append(ObjectRecord(row.id, row.object_id))
-
-        # Handle last group
-        if current_object_records:
-            self._current_batch_no += 1
-            command_batches.append(
-                Command(
-                    od_inst=self.od_inst,
-                    user=self.user,
-                    password=self.password,
-                    agname=current_agname,
-                    pri_nid=current_pri_nid,
-                    dest_subdir=self._get_subfolder_path(current_agid_name),
-                    object_records=current_object_records
-                )
-            )
+        # Verify all rows have the same tape_id
+        if __debug__:
+            tape_id = rows[0].tape_id
+            if not all(r.tape_id == tape_id for r in rows):
+                raise ValueError("All rows must have the same tape_id")
 
-        return command_batches
+        return list(self.iter_commands(rows))
 
 
 class DB2Connection:
-    def __init__(self, database: str, for_updates: bool = False) -> None:
+    def __init__(self, database: str, for_updates: bool = False, pool_size: int = 2) -> None:
         self.database: str = database
         self.user: str = ''
         self.password: str = ''
         self.for_updates: bool = for_updates
+        # Idle connections with the session settings applied, most recently used last
+        self._pool: LifoQueue[ibm_db_dbi.Connection] = LifoQueue(maxsize=pool_size)
 
-    @contextmanager
-    def get_cursor(self) -> Iterator[ibm_db_dbi.Cursor]:
+    def _connect(self) -> ibm_db_dbi.Connection:
+        """Open a new connection and apply the session settings once"""
         try:
             conn: ibm_db_dbi.Connection = ibm_db_dbi.connect(self.database, self.user, self.password)
         except Exception as e:
@@ -631,10 +742,7 @@ class DB2Connection:
             raise
 
         try:
-            logger.debug("Attempting to create cursor")
             cursor: ibm_db_dbi.Cursor = conn.cursor()
-            logger.debug("Cursor created successfully")
-
             if self.for_updates:
                 logger.debug("Setting isolation level CS for updates")
                 try:
@@ -654,13 +762,65 @@ class DB2Connection:
                 except Exception as e:
                     logger.error(f"Failed to set read-only cursor settings: {str(e)}")
                     raise
+            cursor.close()
+        except Exception:
+            self._close_connection(conn)
+            raise
 
-            yield cursor
+        return conn
+
+    @staticmethod
+    def _close_connection(conn: ibm_db_dbi.Connection) -> None:
+        logger.debug("Closing database connection")
+        try:
+            conn.close()
+            logger.debug("Database connection closed successfully")
+        except Exception as e:
+            logger.error(f"Error closing database connection: {str(e)}")
+
+    def _release(self, conn: ibm_db_dbi.Connection, healthy: bool) -> None:
+        """Return a healthy connection to the pool, close it otherwise"""
+        if healthy:
+            try:
+                self._pool.put_nowait(conn)
+                return
+            except Full:
+                pass
+        self._close_connection(conn)
+
+    def close(self) -> None:
+        """Close all idle pooled connections"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except Empty:
+                break
+            self._close_connection(conn)
+
+    @contextmanager
+    def get_cursor(self) -> Iterator[ibm_db_dbi.Cursor]:
+        try:
+            conn: ibm_db_dbi.Connection = self._pool.get_nowait()
+            logger.debug("Reusing pooled database connection")
+        except Empty:
+            conn = self._connect()
+
+        healthy: bool = False
+        try:
+            logger.debug("Attempting to create cursor")
+            cursor: ibm_db_dbi.Cursor = conn.cursor()
+            logger.debug("Cursor created successfully")
+
+            try:
+                yield cursor
+            finally:
+                cursor.close()
 
             if self.for_updates:
                 logger.debug("Committing transaction")
                 conn.commit()
                 logger.debug("Transaction committed successfully")
+            healthy = True
 
         except Exception as e:
             if self.for_updates:
@@ -670,28 +830,27 @@ class DB2Connection:
                 logger.error(f"Error during cursor operation: {str(e)}")
             raise
         finally:
-            logger.debug("Closing database connection")
-            try:
-                conn.close()
-                logger.debug("Database connection closed successfully")
-            except Exception as e:
-                logger.error(f"Error closing database connection: {str(e)}")
+            self._release(conn, healthy)
 
 
 class StatusUpdateManager:
+    # Consecutive failed rounds tolerated after stop() before updates are dropped
+    MAX_FAILED_ROUNDS: int = 5
+
     def __init__(
             self,
             db: DB2Connection,
             table_name: str,
             queue_size: int,
-            update_status: bool
+            update_status: bool,
+            batch_size: int
     ) -> None:
         self.db = db
         self.table_name = table_name
-        self.queue: Queue[Optional[StatusUpdate]] = Queue(queue_size)
-        self.shutdown_event: threading.Event = threading.Event()
+        self.queue: StatusBuffer = StatusBuffer(maxsize=queue_size)
         self.update_thread: Optional[threading.Thread] = None
         self.update_status: bool = update_status
+        self.batch_size: int = batch_size
 
     def start(self) -> None:
         self.update_thread = threading.Thread(
@@ -702,142 +861,202 @@ class StatusUpdateManager:
         logger.info("Status update manager started")
 
     def stop(self) -> None:
-        self.shutdown_event.set()
-        self.queue.put(None)
+        self.queue.close()
         if self.update_thread:
             self.update_thread.join()
         logger.info("Status update manager stopped")
 
     def queue_update(self, status_update: StatusUpdate) -> None:
+        self.queue_updates([status_update])
+
+    def queue_updates(self, status_updates: List[StatusUpdate]) -> None:
+        """Merge several updates into the pending statuses with a single lock acquisition"""
+        if not status_updates:
+            return
         if self.queue.full():
             logger.warning("Update-queue is full, may be blocking consumers.")
         if self.update_status:
-            self.queue.put(status_update)
+            self.queue.put(status_updates)
         else:
             logger.debug("--update_status=False, skipping status update")
 
     def _update_status_worker(self) -> None:
-        while not self.shutdown_event.is_set():
-            try:
-                update: Optional[StatusUpdate] = self.queue.get(timeout=1.0)
-                if update is None:
+        failed_rounds: int = 0
+        while True:
+            # Waits up to a second for a full MERGE worth of ids
+            status_by_id: Dict[int, str] = self.queue.drain(min_ids=self.batch_size, timeout=1.0)
+            if not status_by_id:
+                if self.queue.closed:
                     break
-
-                self._process_single_update(update)
-
-            except Empty:
                 continue
 
+            try:
+                self._process_updates(status_by_id)
+                failed_rounds = 0
             except Exception as e:
                 logger.error(f"Status update worker failed: {e}")
+                # Retried until stop(), then at most MAX_FAILED_ROUNDS more times
+                if self.queue.closed:
+                    failed_rounds += 1
+                if failed_rounds < self.MAX_FAILED_ROUNDS:
+                    self.queue.requeue(status_by_id)
+                else:
+                    logger.error(f"Dropping {len(status_by_id):,} status updates")
                 time.sleep(1)
 
-    def _process_single_update(self, update: StatusUpdate) -> None:
+    def _process_updates(self, status_by_id: Dict[int, str]) -> None:
         if not self.update_status:
-            logger.debug("_process_single_update: Not updating status in db")
+            logger.debug("_process_updates: Not updating status in db")
             return
 
+        pending: Iterator[Tuple[int, str]] = iter(status_by_id.items())
         try:
             with self.db.get_cursor() as cursor:
-                id_values: str = ",".join(str(idx) for idx in update.ids)
-                sql = f"""
-                        UPDATE {self.table_name}
-                        SET STATUS = ?, 
-                        DTSTAMP = CURRENT TIMESTAMP
-                        WHERE ID IN ({id_values})
-                        """
-                cursor.execute(sql, (update.status.value,))
+                while chunk := list(islice(pending, self.batch_size)):
+                    params = [value for row in chunk for value in row]
+                    # Short chunks are padded with NULL ids, which match no row
+                    row_count: int = self._merge_row_count(len(chunk), self.batch_size)
+                    params.extend([None, None] * (row_count - len(chunk)))
+                    cursor.execute(self._merge_status_sql(self.table_name, row_count), params)
 
         except Exception as e:
-            logger.error(f"Status update failed for ids {update.ids}, error: {e}", exc_info=True)
+            logger.error(f"Status update failed for {len(status_by_id)} ids, error: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def _merge_row_count(chunk_size: int, batch_size: int) -> int:
+        """Smallest of 16, 256, 4096, ... capped at batch_size that holds chunk_size rows"""
+        row_count: int = 16
+        while row_count < chunk_size:
+            row_count *= 16
+        return min(row_count, batch_size)
 
-class CommandProcessor:
     @staticmethod
-    def _ensure_directory_exists(subdir: str) -> None:
-        os.makedirs(subdir, exist_ok=True)
-
-    def _execute_command(self, cmd: List[str]) -> Tuple[int, str, str]:
-        """Executes command and returns return_code, stdout, stderr"""
-        process = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True
-        )
-        return process.returncode, process.stdout, process.stderr
+    @lru_cache(maxsize=64)
+    def _merge_status_sql(table_name: str, row_count: int) -> str:
+        """MERGE of row_count (ID, STATUS) pairs"""
+        values = ", ".join(["(CAST(? AS BIGINT), CAST(? AS VARCHAR(32)))"] * row_count)
+        return f"""
+                MERGE INTO {table_name} AS T
+                USING (VALUES {values}) AS S(ID, STATUS)
+                ON T.ID = S.ID
+                WHEN MATCHED THEN UPDATE SET
+                    STATUS = S.STATUS,
+                    DTSTAMP = CURRENT TIMESTAMP
+                """
+
+
+class CommandProcessor:
+    # Known arsadmin errors, lastgroup names the one found
+    ARS_ERROR_RE: re.Pattern = re.compile(
+        r"ARS1159E Unable to retrieve the object >(?P<object_id>\S+)<"
+        r"|(?P<storage_node>ARS1168E Unable to determine Storage Node)"
+        r"|(?P<application_group>ARS1110E The application group)"
+    )
+
+    def __init__(self, command_timeout_seconds: Optional[int] = None) -> None:
+        # arsadmin runs longer than this are killed, None waits forever
+        self.command_timeout_seconds: Optional[int] = command_timeout_seconds
+        # batch_N parents known to exist, shared by all consumers
+        self._ensured_dirs: Set[str] = set()
+
+    def _ensure_directory_exists(self, subdir: str) -> None:
+        """Create the command directory, its batch_N parent only once"""
+        parent: str = os.path.dirname(subdir)
+        if parent not in self._ensured_dirs:
+            os.makedirs(parent, exist_ok=True)
+            self._ensured_dirs.add(parent)
+        try:
+            os.mkdir(subdir)
+        except FileExistsError:
+            pass
+
+    def _execute_command(self, cmd: List[str]) -> Tuple[int, str]:
+        """Executes command and returns return_code, stderr"""
+        try:
+            process = subprocess.run(
+                cmd,
+                stdin=subprocess.DEVNULL,  # never wait on a prompt, e.g. for a missing password
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=self.command_timeout_seconds
+            )
+        except subprocess.TimeoutExpired:
+            # run() has already killed and reaped the child
+            return -1, f"arsadmin killed after {self.command_timeout_seconds}s timeout"
+        if process.returncode == 0:
+            return process.returncode, ""
+        return process.returncode, process.stderr.decode(errors='replace')
 
     def process_command(self, command: Command) -> CommandResult:
         """
         Processes a single command, handling errors and retries
         based on specific error conditions.
         """
-        remaining_object_records: list[ObjectRecord] = command.object_records.copy()
-        dictionary: dict[str, int] = {obj.object_id: obj.db_record_id for obj in remaining_object_records}
+        object_records: List[ObjectRecord] = command.object_records
+        # Parallel to object_records
+        object_ids: List[str] = [obj.object_id for obj in object_records]
+        record_ids: List[int] = [obj.db_record_id for obj in object_records]
+        start: int = 0  # first object not retrieved yet, retries resume here
         successful_ids: Set[int] = set()
         failed_ids: Set[int] = set()
 
         self._ensure_directory_exists(command.dest_subdir)
 
+        # Everything but the object names is the same for every retry
+        cmd_prefix: List[str] = [
+            "arsadmin", "retrieve",
+            "-I", command.od_inst,
+            '-u', command.user,
+            *(['-p', command.password] if command.password else []),
+            '-g', command.agname,
+            "-n", f'{command.pri_nid}-0',
+            "-d", command.dest_subdir,
+        ]
+
         try:
-            while remaining_object_records:
+            while start < len(object_records):
                 # Build and execute command
-                cmd = [
-                    "arsadmin", "retrieve",
-                    "-I", command.od_inst,
-                    '-u', command.user,
-                    *(['-p', command.password] if command.password else []),
-                    '-g', command.agname,
-                    "-n", f'{command.pri_nid}-0',
-                    "-d", command.dest_subdir,
-                ]
-                cmd.extend(object_record.object_id for object_record in remaining_object_records)
-
-                return_code, stdout, stderr = self._execute_command(cmd)
+                cmd = cmd_prefix + object_ids[start:]
+
+                return_code, stderr = self._execute_command(cmd)
 
                 if return_code != 0:
-                    if "ARS1159E Unable to retrieve the object" in stderr:
-                        match = re.search(
-                            r"Unable to retrieve the object >(\S+)<",
-                            stderr
+                    match = self.ARS_ERROR_RE.search(stderr)
+                    error: Optional[str] = match.lastgroup if match else None
+                    if error == 'object_id':
+                        failing_object_id: str = match.group('object_id')
+                        logger.error(
+                            f"code: {return_code}, document: {failing_object_id}, "
+                            f"message: Unable to retrieve document, "
+                            f"skipping current document and re-executing command"
                         )
-                        if match:
-                            failing_object_id: str = match.group(1)
-                            logger.error(
-                                f"code: {return_code}, document: {failing_object_id}, "
-                                f"message: Unable to retrieve document, "
-                                f"skipping current document and re-executing command"
-                            )
-
-                            failed_ids.add(dictionary[failing_object_id])
-
-                            # Find index of failing object and continue with remaining ones
-                            for i, object_record in enumerate(remaining_object_records):
-                                successful_ids.add(object_record.db_record_id)
-                                if object_record.object_id == failing_object_id:
-                                    remaining_object_records = remaining_object_records[i + 1:]
-                                    break
 
-                            continue
+                        # Objects before the failing one were retrieved, continue after it
+                        # An id not among the pending objects fails the rest below
+                        failing_index: int = object_ids.index(failing_object_id, start)
+                        failed_ids.add(record_ids[failing_index])
+                        successful_ids.update(record_ids[start:failing_index])
+                        start = failing_index + 1
 
-                    elif "ARS1168E Unable to determine Storage Node" in stderr:
+                        continue
+
+                    elif error == 'storage_node':
                         error_msg = f"Unable to determine Storage Node ({command.pri_nid})"
                         logger.error(
                             f"code: {return_code}, message: {error_msg}, "
                             f"skipping remaining documents in this command"
                         )
-                        for object_record in remaining_object_records:
-                            failed_ids.add(object_record.db_record_id)
+                        failed_ids.update(record_ids[start:])
                         break
 
-                    elif "ARS1110E The application group" in stderr:
+                    elif error == 'application_group':
                         error_msg = "The Application Group (or permission) doesn't exist"
                         logger.error(
                             f"code: {return_code}, message: {error_msg}, "
                             f"skipping remaining documents in this command"
                         )
-                        for object_record in remaining_object_records:
-                            failed_ids.add(object_record.db_record_id)
+                        failed_ids.update(record_ids[start:])
                         break
 
                     else:
@@ -845,21 +1064,18 @@ class CommandProcessor:
                             f"code: {return_code}, message: {stderr}, "
                             f"skipping remaining documents in this command"
                         )
-                        for object_record in remaining_object_records:
-                            failed_ids.add(object_record.db_record_id)
+                        failed_ids.update(record_ids[start:])
                         break
 
                 else:
                     # Command successful - mark all remaining objects as successful
-                    for object_record in remaining_object_records:
-                        successful_ids.add(object_record.db_record_id)
+                    successful_ids.update(record_ids[start:])
                     break
 
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
             logger.error(error_msg)
-            for object_record in remaining_object_records:
-                failed_ids.add(object_record.db_record_id)
+            failed_ids.update(record_ids[start:])
 
         return CommandResult(
             successful_ids=successful_ids,
@@ -868,6 +1084,21 @@ class CommandProcessor:
 
 
 class DataProcessor:
+    # Rows per fetch block are sized to move roughly this many bytes
+    FETCH_TARGET_BYTES: int = 900_000
+    MIN_FETCH_ROWS: int = 1000
+    # Streaming fetches read fetch_size / FETCH_SUB_BATCHES rows at a time
+    FETCH_SUB_BATCHES: int = 8
+    # Longest a consumer holds back status updates when acks are batched
+    ACK_FLUSH_SECONDS: float = 0.5
+
+    # Column order matches DBRow
+    SELECT_COLUMNS: Tuple[str, ...] = (
+        'ID', 'ODSLOC', 'ODCREATS', 'AGID_NAME_SRC', 'AGNAME', 'LOADID', 'PRINID'
+    )
+    # Reads the tape id straight from a fetched tuple
+    TAPE_ID_OF: Callable[[tuple], str] = itemgetter(SELECT_COLUMNS.index('ODSLOC'))
+
     def __init__(
             self,
             read_db: DB2Connection,
@@ -881,14 +1112,21 @@ class DataProcessor:
             db_read_batch_size: int,
             num_consumers: int,
             consumers_queue_size: int,
-            timeout_seconds: int
+            timeout_seconds: int,
+            page_size: Optional[int] = None,
+            claim_db: Optional[DB2Connection] = None,
+            tape_workers: int = 1,
+            adaptive_batch: bool = False,
+            consumer_ack_batch: int = 1
     ) -> None:
         self.read_db = read_db
+        # When set, rows are claimed (marked STARTED) by the statement that reads them
+        self.claim_db: Optional[DB2Connection] = claim_db
         self.status_update_manager = status_update_manager
         self.table_name = table_name
         self.command_batch_builder = command_batch_builder
         self.command_processor = command_processor
-        self.queue: Queue[Optional[List[Command]]] = Queue(maxsize=consumers_queue_size)
+        self.queue: RingBuffer = RingBuffer(maxsize=consumers_queue_size)
 
         self.metrics_monitor = metrics_monitor
         self.metrics_monitor.set_queues(self.queue, self.status_update_manager.queue)
@@ -897,20 +1135,259 @@ class DataProcessor:
         self.runtime_statistics_calculator: RuntimeStatisticsCalculator = runtime_stats_calculator
 
         self.db_read_batch_size = db_read_batch_size
+        self.page_size: Optional[int] = page_size
+        # Size streaming fetches by consumer queue depth instead of fixed slices
+        self.adaptive_batch: bool = adaptive_batch
         self.num_consumers = num_consumers
+        # arsadmin processes each consumer may run at once for the commands of one tape
+        self.tape_workers: int = tape_workers
+        # Commands a consumer completes before handing their status updates over in one go
+        self.consumer_ack_batch: int = max(1, consumer_ack_batch)
         self.shutdown_event: threading.Event = threading.Event()
 
         self.timeout_seconds = timeout_seconds
-        self.start_time: float = time.time()
+        # Run timeout in perf_counter_ns() units, 0 for none
+        self._timeout_ns: int = timeout_seconds * 1_000_000_000 if timeout_seconds else 0
+        self.start_time: int = time.perf_counter_ns()
 
     def _check_timeout(self) -> None:
-        if self.timeout_seconds and time.time() - self.start_time > self.timeout_seconds:
+        if self._timeout_ns and time.perf_counter_ns() - self.start_time > self._timeout_ns:
             logger.error(
                 f"Timeout of {self.timeout_seconds} seconds reached, "
                 f"Initiating shutdown..."
             )
             self.shutdown_event.set()
 
+    def _tune_fetch_size(self, cursor: ibm_db_dbi.Cursor) -> int:
+        """Rows per fetch derived from the result set row width, capped by db_read_batch_size"""
+        row_bytes = sum(column[3] or 0 for column in cursor.description or [])
+        if row_bytes <= 0:
+            return self.db_read_batch_size
+        fetch_size = min(
+            self.db_read_batch_size,
+            max(self.MIN_FETCH_ROWS, self.FETCH_TARGET_BYTES // row_bytes)
+        )
+        logger.info(f"Fetch block of {fetch_size:,} rows (~{row_bytes} bytes per row)")
+        return fetch_size
+
+    @staticmethod
+    def _extract_ids(rows: List[DBRow]) -> List[int]:
+        """Collect the ID column of rows"""
+        return list(map(itemgetter(0), rows))
+
+    @staticmethod
+    def _prefetch_rows(fetch: Callable[[], List[tuple]], depth: int = 2) -> Iterator[List[tuple]]:
+        """Yields fetch() results, running up to depth fetches ahead on a helper thread"""
+        fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fetcher')
+        try:
+            # A single worker runs the fetches in submission order
+            pending: Deque[Future] = deque(fetcher.submit(fetch) for _ in range(depth))
+            while True:
+                rows = pending.popleft().result()
+                if not rows:
+                    yield rows
+                    return
+                pending.append(fetcher.submit(fetch))
+                yield rows
+        finally:
+            # Cancel fetches that have not started yet
+            fetcher.shutdown(cancel_futures=True)
+
+    def _select_sql(self, where: str, order_by: Tuple[str, ...], fetch_first: Optional[int] = None) -> str:
+        limit: str = f"FETCH FIRST {fetch_first} ROWS ONLY" if fetch_first else ""
+        return f"""
+            SELECT 
+                {", ".join(self.SELECT_COLUMNS)}
+            FROM 
+                {self.table_name}
+            WHERE 
+                {where}
+            ORDER BY 
+                {", ".join(order_by)}
+            {limit}
+            FOR READ ONLY
+            --#SET ISOLATION = UR
+            OPTIMIZE FOR {fetch_first or self.db_read_batch_size} ROWS
+        """
+
+    @staticmethod
+    def _seek_predicate(key_columns: Tuple[str, ...], null_key: Tuple[bool, ...]) -> str:
+        """(k1, k2, ...) > (?, ?, ...) spelled out as nested ORs, NULLs sort last"""
+        terms: List[str] = []
+        for i, column in enumerate(key_columns):
+            if null_key[i]:
+                continue  # nothing sorts after NULL
+            conditions = [
+                f"{c} IS NULL" if is_null else f"{c} = ?"
+                for c, is_null in zip(key_columns[:i], null_key)
+            ]
+            conditions.append(f"({column} > ? OR {column} IS NULL)")
+            terms.append(f"({' AND '.join(conditions)})")
+        return f"({' OR '.join(terms)})"
+
+    @staticmethod
+    def _seek_params(last_key: tuple) -> List[Any]:
+        """Parameters for _seek_predicate, each OR term binds the non-NULL prefix of the key"""
+        return [
+            value
+            for i in range(len(last_key)) if last_key[i] is not None
+            for value in last_key[:i + 1] if value is not None
+        ]
+
+    def _keyset_fetcher(
+            self,
+            cursor: ibm_db_dbi.Cursor,
+            where: str,
+            params: Tuple[Any, ...],
+            order_by: Tuple[str, ...]
+    ) -> Callable[[], List[tuple]]:
+        """Returns a callable reading the next page_size rows after the last one returned"""
+        key_columns: Tuple[str, ...] = (*order_by, 'ID')  # ID makes the key unique
+        key_of: Callable[[tuple], tuple] = itemgetter(*(self.SELECT_COLUMNS.index(c) for c in key_columns))
+        first_sql: str = self._select_sql(where, key_columns, self.page_size)
+        # Seek statements by pattern of NULLs in the last key
+        seek_sql_by_nulls: Dict[Tuple[bool, ...], str] = {}
+        last_key: Optional[tuple] = None
+        exhausted: bool = False
+
+        def fetch_page() -> List[tuple]:
+            nonlocal last_key, exhausted
+            if exhausted:
+                return []
+            if last_key is None:
+                cursor.execute(first_sql, params)
+            else:
+                null_key: Tuple[bool, ...] = tuple(value is None for value in last_key)
+                seek_sql: Optional[str] = seek_sql_by_nulls.get(null_key)
+                if seek_sql is None:
+                    seek_sql = seek_sql_by_nulls[null_key] = self._select_sql(
+                        f"{where} AND {self._seek_predicate(key_columns, null_key)}", key_columns, self.page_size
+                    )
+                cursor.execute(seek_sql, [*params, *self._seek_params(last_key)])
+            rows = cursor.fetchall()
+            if len(rows) < self.page_size:
+                exhausted = True
+            if rows:
+                last_key = key_of(rows[-1])
+            return rows
+
+        return fetch_page
+
+    def _claim_fetcher(
+            self,
+            where: str,
+            params: Tuple[Any, ...],
+            order_by: Tuple[str, ...]
+    ) -> Callable[[], List[tuple]]:
+        """Returns a callable that marks the next rows STARTED and returns them"""
+        claim_size: int = self.page_size or self.db_read_batch_size
+        key_columns: Tuple[str, ...] = (*order_by, 'ID')
+        columns: str = ", ".join(self.SELECT_COLUMNS)
+        # The updatable fullselect must expose the columns the UPDATE sets
+        claim_columns: str = ", ".join((*self.SELECT_COLUMNS, 'STATUS', 'DTSTAMP'))
+        sql: str = f"""
+            SELECT 
+                {columns}
+            FROM FINAL TABLE (
+                UPDATE (
+                    SELECT {claim_columns}
+                    FROM {self.table_name}
+                    WHERE {where}
+                    ORDER BY {", ".join(key_columns)}
+                    FETCH FIRST {claim_size} ROWS ONLY
+                )
+                SET STATUS = ?,
+                    DTSTAMP = CURRENT TIMESTAMP
+            )
+            ORDER BY 
+                {", ".join(key_columns)}
+        """
+        claim_params: Tuple[Any, ...] = (*params, ProcessingStatus.STARTED.value)
+
+        def claim() -> List[tuple]:
+            with self.claim_db.get_cursor() as cursor:
+                cursor.execute(sql, claim_params)
+                return cursor.fetchall()
+
+        return claim
+
+    def _row_batches(
+            self,
+            where: str,
+            params: Tuple[Any, ...],
+            order_by: Tuple[str, ...]
+    ) -> Iterator[List[tuple]]:
+        """Raw row batches in ORDER BY order, an empty list once no rows are left"""
+        if self.claim_db:
+            logger.info("Claiming rows as they are read")
+            # Claimed synchronously, without read-ahead
+            yield from iter(self._claim_fetcher(where, params, order_by), [])
+            yield []
+            return
+
+        with self.read_db.get_cursor() as cursor:
+            if self.page_size:
+                logger.info(f"Reading keyset pages of {self.page_size:,} rows")
+                yield from self._prefetch_rows(self._keyset_fetcher(cursor, where, params, order_by))
+                return
+
+            cursor.execute(self._select_sql(where, order_by), params)
+            fetch_size: int = self._tune_fetch_size(cursor)
+            cursor.arraysize = fetch_size
+            if self.adaptive_batch:
+                yield from self._prefetch_rows(self._adaptive_fetcher(cursor, fetch_size))
+                return
+            sub_batch_size: int = max(1, fetch_size // self.FETCH_SUB_BATCHES)
+            logger.info(f"Fetching {sub_batch_size:,} rows per round")
+            yield from self._prefetch_rows(partial(cursor.fetchmany, sub_batch_size))
+
+    def _adaptive_fetcher(self, cursor: ibm_db_dbi.Cursor, fetch_size: int) -> Callable[[], List[tuple]]:
+        """fetchmany() sized by consumer queue depth"""
+        sub_batch_size: int = max(1, fetch_size // self.FETCH_SUB_BATCHES)
+        starved_size: int = min(sub_batch_size, max(64, fetch_size // 16))
+        logger.info(f"Fetching {starved_size:,} to {fetch_size:,} rows per round, by consumer queue depth")
+
+        def fetch() -> List[tuple]:
+            depth: int = self.queue.qsize()
+            if depth < 2:
+                return cursor.fetchmany(starved_size)
+            if depth > self.queue.maxsize // 2:
+                return cursor.fetchmany(fetch_size)
+            return cursor.fetchmany(sub_batch_size)
+
+        return fetch
+
+    def _publish(self, commands: List[Command]) -> bool:
+        """Queue commands for the consumers, False once shutdown is requested"""
+        while not self.shutdown_event.is_set():
+            try:
+                self.queue.put(commands, timeout=1.0)
+                return True
+            except Full:
+                self._check_timeout()
+        return False
+
+    def _release_rows(self, ids: Collection[int]) -> None:
+        """Set rows marked STARTED but never processed back to NOTSTARTED"""
+        if not ids:
+            return
+        logger.warning(f"Shutdown requested, releasing {len(ids):,} unprocessed rows")
+        self.status_update_manager.queue_update(
+            StatusUpdate(ids=ids, status=ProcessingStatus.NOTSTARTED)
+        )
+
+    def _release_queued(self) -> None:
+        """Release the rows of commands still queued after the consumers stopped"""
+        ids: List[int] = []
+        while True:
+            try:
+                tape_commands: List[Command] = self.queue.get(timeout=0)
+            except Empty:
+                break
+            for command in tape_commands:
+                ids.extend(obj.db_record_id for obj in command.object_records)
+        self._release_rows(ids)
+
     def _fetch_by_tape(self):
         def produce_by_tape(rows: List[DBRow]) -> None:
             if not rows:
@@ -920,80 +1397,55 @@ class DataProcessor:
             tape_commands: List[Command] = self.command_batch_builder.build_tape_commands(rows)
 
             # Update status for all objects
-            status_update = StatusUpdate(
-                ids={
-                    obj.db_record_id
-                    for cmd in tape_commands
-                    for obj in cmd.object_records
-                },
-                status=ProcessingStatus.STARTED
-            )
-            self.status_update_manager.queue_update(status_update)
+            if not self.claim_db:
+                status_update = StatusUpdate(
+                    ids=self._extract_ids(rows),
+                    status=ProcessingStatus.STARTED
+                )
+                self.status_update_manager.queue_update(status_update)
 
             if self.queue.full():
                 logger.warning("Consumer-queue is full, may be blocking producers")
 
             # Queue the tape commands
-            self.queue.put(tape_commands)
+            if not self._publish(tape_commands):
+                self._release_rows(self._extract_ids(rows))
 
+        buffer: List[DBRow] = []
         try:
-            with self.read_db.get_cursor() as cursor:
-                query: str = f"""
-                    SELECT 
-                        ID,
-                        ODSLOC,
-                        ODCREATS,
-                        AGID_NAME_SRC,
-                        AGNAME,
-                        LOADID,
-                        PRINID,
-                        STATUS,
-                        DTSTAMP
-                    FROM 
-                        {self.table_name}
-                    WHERE 
-                        STATUS = '{ProcessingStatus.NOTSTARTED.value}'
-                    ORDER BY 
-                        ODSLOC,
-                        AGNAME,
-                        PRINID,
-                        ODCREATS
-                    --#SET ISOLATION = UR
-                    OPTIMIZE FOR {self.db_read_batch_size} ROWS
-                """
-
-                cursor.execute(query)
+            batches: Iterator[List[tuple]] = self._row_batches(
+                where="STATUS = ?",
+                params=(ProcessingStatus.NOTSTARTED.value,),
+                order_by=('ODSLOC', 'AGNAME', 'PRINID', 'ODCREATS')
+            )
 
-                buffer: List[DBRow] = []
-                current_tape_id: Optional[str] = None
+            current_tape_id: Optional[str] = None
+            make_row: Callable[[tuple], DBRow] = DBRow._make
 
+            with closing(batches):
                 while True:
                     self._check_timeout()
                     if self.shutdown_event.is_set():
                         break
 
                     logger.debug("producer, before rows fetched")
-                    rows = cursor.fetchmany(self.db_read_batch_size)
+                    rows = next(batches)
                     logger.debug("producer, rows fetched")
                     if not rows:
                         # Process any remaining buffered rows
                         if buffer:
                             produce_by_tape(buffer)
+                            buffer = []
                         break
 
-                    db_rows: list[DBRow] = [DBRow(*row) for row in rows]
-
-                    for row in db_rows:
-                        if current_tape_id is None:
-                            current_tape_id = row.tape_id
-
-                        if row.tape_id != current_tape_id:
+                    # Split the rows by tape id
+                    for tape_id, tape_rows in groupby(rows, key=self.TAPE_ID_OF):
+                        if tape_id != current_tape_id:
                             # Process complete tape group
                             produce_by_tape(buffer)
-                            buffer = [row]
-                            current_tape_id = row.tape_id
-                        else:
-                            buffer.append(row)
+                            buffer = []
+                            current_tape_id = tape_id
+                        buffer.extend(map(make_row, tape_rows))
 
                     # If we've processed all rows but still have data in buffer,
                     # wait for next batch as this tape_id group might continue
@@ -1003,71 +1455,55 @@ class DataProcessor:
             self.shutdown_event.set()
             raise
         finally:
-            for _ in range(self.num_consumers):
-                self.queue.put(None)
+            self.queue.close()
+            # A carried-over tape is only claimed, never queued
+            if self.claim_db:
+                self._release_rows(self._extract_ids(buffer))
 
     def _fetch_by_agname(self):
         def simple_produce(rows: List[DBRow]) -> None:
             if not rows:
                 return
 
-            # Create commands
-            commands: List[Command] = self.command_batch_builder.simple_build_commands(rows)
-
             # Update status for all objects
-            status_update = StatusUpdate(
-                ids={
-                    obj.db_record_id
-                    for cmd in commands
-                    for obj in cmd.object_records
-                },
-                status=ProcessingStatus.STARTED
-            )
-            self.status_update_manager.queue_update(status_update)
+            if not self.claim_db:
+                status_update = StatusUpdate(
+                    ids=self._extract_ids(rows),
+                    status=ProcessingStatus.STARTED
+                )
+                self.status_update_manager.queue_update(status_update)
 
-            # Queue the tape commands, only one command in list
-            for command in commands:
+            # Queue the commands as they are built, only one command in list
+            published: int = 0
+            for command in self.command_batch_builder.iter_commands(rows):
                 if self.queue.full():
                     logger.warning("Consumer-queue is full, may be blocking producers")
-                self.queue.put([command])
+                if not self._publish([command]):
+                    # The rest of the page was not queued
+                    self._release_rows(self._extract_ids(rows[published:]))
+                    return
+                published += len(command.object_records)
 
         try:
-            with self.read_db.get_cursor() as cursor:
-                query: str = f"""
-                    SELECT 
-                        ID,
-                        ODSLOC,
-                        ODCREATS,
-                        AGID_NAME_SRC,
-                        AGNAME,
-                        LOADID,
-                        PRINID,
-                        STATUS,
-                        DTSTAMP
-                    FROM 
-                        {self.table_name}
-                    WHERE 
-                        STATUS = '{ProcessingStatus.NOTSTARTED.value}' AND AGNAME != ''
-                    ORDER BY 
-                        AGNAME,
-                        ODSLOC,
-                        ODCREATS
-                    --#SET ISOLATION = UR
-                    OPTIMIZE FOR {self.db_read_batch_size} ROWS
-                """
+            batches: Iterator[List[tuple]] = self._row_batches(
+                where="STATUS = ? AND AGNAME != ''",
+                params=(ProcessingStatus.NOTSTARTED.value,),
+                order_by=('AGNAME', 'ODSLOC', 'ODCREATS')
+            )
 
-                cursor.execute(query)
+            make_row: Callable[[tuple], DBRow] = DBRow._make
 
+            with closing(batches):
                 while True:
                     self._check_timeout()
                     if self.shutdown_event.is_set():
                         break
 
-                    rows = cursor.fetchmany(self.db_read_batch_size)
+                    rows = next(batches)
                     if not rows:
                         break
 
-                    db_rows: list[DBRow] = [DBRow(*row) for row in rows]
+                    db_rows: list[DBRow] = list(map(make_row, rows))
                     simple_produce(db_rows)
 
         except Exception as e:
@@ -1075,67 +1511,114 @@ class DataProcessor:
             self.shutdown_event.set()
             raise
         finally:
-            for _ in range(self.num_consumers):
-                self.queue.put(None)
+            self.queue.close()
 
     def producer(self) -> None:
         logger.debug("producer thread started")
         self._fetch_by_tape()
         # self._fetch_by_agname()
 
-    def consumer(self) -> None:
+    def _command_status_updates(self, command: Command) -> List[StatusUpdate]:
+        """Run one command and turn its result into status updates"""
+        try:
+            command_result: CommandResult = self.command_processor.process_command(command)
+            status_updates: List[StatusUpdate] = []
+
+            # Update successful objects
+            if command_result.successful_ids:
+                status_updates.append(
+                    StatusUpdate(
+                        ids=command_result.successful_ids,
+                        status=ProcessingStatus.COMPLETED
+                    )
+                )
+
+            if command_result.failed_ids:
+                status_updates.append(
+                    StatusUpdate(
+                        ids=command_result.failed_ids,
+                        status=ProcessingStatus.FAILED
+                    )
+                )
+            return status_updates
+
+        except Exception as e:
+            logger.error(f"Failed to process command: {str(e)}")
+            # Mark all objects as failed
+            failed_objects = {
+                obj.db_record_id for obj in command.object_records
+            }
+            return [
+                StatusUpdate(
+                    ids=failed_objects,
+                    status=ProcessingStatus.FAILED
+                )
+            ]
+
+    def consumer(self, slot_id: int) -> None:
         logger.info("consumer started")
-        while not self.shutdown_event.is_set():
-            try:
-                self._check_timeout()
-                if self.queue.empty():
-                    logger.warning("Consumer-queue is empty, consumer may be idle")
+        # Commands of one tape run in parallel only when tape_workers > 1
+        tape_executor: Optional[ThreadPoolExecutor] = None
+        if self.tape_workers > 1:
+            tape_executor = ThreadPoolExecutor(
+                max_workers=self.tape_workers,
+                thread_name_prefix=f'consumer-{slot_id}-tape'
+            )
 
-                tape_commands: Optional[List[Command]] = self.queue.get()
-                if tape_commands is None:
-                    break
+        # Status updates held until consumer_ack_batch commands ran or ACK_FLUSH_SECONDS passed
+        status_updates: List[StatusUpdate] = []
+        pending_commands: int = 0
+        last_flush: float = time.monotonic()
+
+        def flush_status_updates() -> None:
+            nonlocal status_updates, pending_commands, last_flush
+            self.status_update_manager.queue_updates(status_updates)
+            status_updates = []
+            pending_commands = 0
+            last_flush = time.monotonic()
+
+        try:
+            while not self.shutdown_event.is_set():
+                try:
+                    self._check_timeout()
+                    if self.queue.empty():
+                        logger.warning("Consumer-queue is empty, consumer may be idle")
 
-                for command in tape_commands:
                     try:
-                        command_result: CommandResult = self.command_processor.process_command(command)
-                        self.metrics_monitor.increment_processed(len(command.object_records))
-
-                        # Update successful objects
-                        if command_result.successful_ids:
-                            self.status_update_manager.queue_update(
-                                StatusUpdate(
-                                    ids=command_result.successful_ids,
-                                    status=ProcessingStatus.COMPLETED
-                                )
-                            )
-
-                        if command_result.failed_ids:
-                            self.status_update_manager.queue_update(
-                                StatusUpdate(
-                                    ids=command_result.failed_ids,
-                                    status=ProcessingStatus.FAILED
-                                )
-                            )
-
-                    except Exception as e:
-                        logger.error(f"Failed to process command: {str(e)}")
-                        # Mark all objects as failed
-                        failed_objects = {
-                            obj.db_record_id for obj in command.object_records
-                        }
-                        self.status_update_manager.queue_update(
-                            StatusUpdate(
-                                ids=failed_objects,
-                                status=ProcessingStatus.FAILED
-                            )
+                        # Wake up to flush held updates
+                        tape_commands: List[Command] = self.queue.get(
+                            timeout=self.ACK_FLUSH_SECONDS if status_updates else None
                         )
+                    except Empty:
+                        if status_updates:
+                            flush_status_updates()
+                            continue
+                        break  # producer is done and the queue is drained
 
-            except Exception as e:
-                logger.error(f"Consumer error: {str(e)}")
-                if not self.shutdown_event.is_set():
-                    time.sleep(1)  # Prevent tight error loop
-            finally:
-                self.queue.task_done()
+                    run_commands = tape_executor.map if tape_executor and len(tape_commands) > 1 else map
+
+                    for command, command_updates in zip(
+                            tape_commands, run_commands(self._command_status_updates, tape_commands)
+                    ):
+                        # Counted here, the slot belongs to this consumer thread only
+                        self.metrics_monitor.increment_processed(slot_id, len(command.object_records))
+                        status_updates.extend(command_updates)
+                    pending_commands += len(tape_commands)
+
+                    if (pending_commands >= self.consumer_ack_batch
+                            or time.monotonic() - last_flush >= self.ACK_FLUSH_SECONDS):
+                        flush_status_updates()
+
+                except Exception as e:
+                    logger.error(f"Consumer error: {str(e)}")
+                    if not self.shutdown_event.is_set():
+                        time.sleep(1)  # Prevent tight error loop
+        finally:
+            if tape_executor:
+                tape_executor.shutdown()
+            # Flush updates of commands that already ran
+            if status_updates:
+                flush_status_updates()
 
     def run(self):
         # Start monitoring daemons, no needs to kill tem explicitly
@@ -1152,6 +1635,7 @@ class DataProcessor:
         for i in range(self.num_consumers):
             consumer = threading.Thread(
                 target=self.consumer,
+                args=(i,),
                 name=f'consumer-{i}'
             )
             consumer.start()
@@ -1162,6 +1646,8 @@ class DataProcessor:
             for consumer in consumers:
                 consumer.join()
 
+            self._release_queued()
+
             if self.shutdown_event.is_set():
                 raise RuntimeError("Processing failed - check logs for details")
 
@@ -1177,7 +1663,25 @@ def load_config(config_path: Optional[str] = None) -> Config:
         config_path = str(Path(__file__).parent / 'config.yaml')
 
     with open(config_path) as f:
-        yaml_config = yaml.safe_load(f)
+        # libyaml's C loader when available
+        yaml_config = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+    update_batch_size: int = yaml_config['db_updater'].get('update_batch_size', 1000)  # Optional
+    if update_batch_size <= 0:
+        raise ValueError("update_batch_size must be greater than 0")
+
+    page_size: Optional[int] = yaml_config['producer_consumer'].get('page_size')  # Optional
+    if page_size is not None and page_size <= 0:
+        raise ValueError("page_size must be greater than 0 or null")
+
+    tape_workers: int = yaml_config['producer_consumer'].get('tape_workers', 1)  # Optional
+    if tape_workers < 1:
+        raise ValueError("tape_workers must be at least 1")
+
+    # Claiming writes STARTED itself, which update_status=false must not do
+    claim_rows: bool = yaml_config['producer_consumer'].get('claim_rows', False)  # Optional
+    if claim_rows and not yaml_config['db_updater']['update_status']:
+        raise ValueError("claim_rows requires update_status")
 
     return Config(
         # Database
@@ -1187,10 +1691,16 @@ def load_config(config_path: Optional[str] = None) -> Config:
         read_batch_size=yaml_config['producer_consumer']['read_batch_size'],
         num_consumers=yaml_config['producer_consumer']['num_consumers'],
         consumers_queue_size=yaml_config['producer_consumer']['consumers_queue_size'],
+        page_size=page_size,
+        claim_rows=claim_rows,
+        adaptive_batch=yaml_config['producer_consumer'].get('adaptive_batch', False),  # Optional
+        consumer_ack_batch=yaml_config['producer_consumer'].get('consumer_ack_batch', 1),  # Optional
+        tape_workers=tape_workers,
 
         # Updater
         update_queue_size=yaml_config['db_updater']['update_queue_size'],
         update_status=yaml_config['db_updater']['update_status'],
+        update_batch_size=update_batch_size,
 
         # Arsadmin
         command_max_objects=yaml_config['arsadmin']['command_max_objects'],
@@ -1199,6 +1709,7 @@ def load_config(config_path: Optional[str] = None) -> Config:
         password=yaml_config['arsadmin'].get('password'),  # Optional
         od_inst=yaml_config['arsadmin']['od_inst'],
         base_dir=yaml_config['arsadmin']['base_dir'],
+        command_timeout_seconds=yaml_config['arsadmin'].get('command_timeout_seconds'),  # Optional
 
         # Monitoring
         metrics_interval_seconds=yaml_config['monitoring']['metrics_interval_seconds'],
@@ -1243,16 +1754,22 @@ def main() -> None:
         db = update_db,
         table_name= args.table_name,
         queue_size= config.update_queue_size,
-        update_status = config.update_status
+        update_status = config.update_status,
+        batch_size = config.update_batch_size
+    )
+    command_processor = CommandProcessor(
+        command_timeout_seconds = config.command_timeout_seconds
     )
-    command_processor = CommandProcessor()
     disk_space_monitor=DiskSpaceMonitor(
         path=base_dir,
         minimum_disk_space_percentage=config.minimum_disk_space_percentage,
         interval_seconds=config.disk_interval_seconds,
         terminal_operation=runtime_statistics_calculator.calculate_and_log_metrics
     )
-    metrics_monitor=MetricsMonitor(log_interval=config.metrics_interval_seconds)
+    metrics_monitor=MetricsMonitor(
+        log_interval=config.metrics_interval_seconds,
+        num_slots=config.num_consumers
+    )
     processor = DataProcessor(
         read_db = read_db,
         status_update_manager = status_update_manager,
@@ -1265,9 +1782,15 @@ def main() -> None:
         db_read_batch_size= config.read_batch_size,
         num_consumers = config.num_consumers,
         consumers_queue_size = config.consumers_queue_size,
-        timeout_seconds = config.timeout_seconds
+        timeout_seconds = config.timeout_seconds,
+        page_size = config.page_size,
+        claim_db = update_db if config.claim_rows else None,
+        tape_workers = config.tape_workers,
+        adaptive_batch = config.adaptive_batch,
+        consumer_ack_batch = config.consumer_ack_batch
     )
 
+    status_update_manager.start()
     try:
         processor.run()
 
@@ -1275,6 +1798,12 @@ def main() -> None:
         logger.error(f"Processing failed: {e}")
         raise
 
+    finally:
+        # Writes the remaining status updates before the connection goes away
+        status_update_manager.stop()
+        read_db.close()
+        update_db.close()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import threading
+import unittest
+from unittest import mock
+
+import db2_processor
+from db2_processor import ProcessingStatus, StatusBuffer, StatusUpdate, StatusUpdateManager
+
+
+class StatusBufferRequeueTest(unittest.TestCase):
+    def test_requeue_blocks_put_until_next_drain(self):
+        buffer = StatusBuffer(maxsize=2)
+        buffer.put([StatusUpdate([1, 2], ProcessingStatus.STARTED)])
+        status_by_id = buffer.drain(timeout=0)
+        self.assertFalse(buffer.full())
+
+        buffer.requeue(status_by_id)
+
+        self.assertTrue(buffer.full())
+        self.assertEqual(buffer.drain(timeout=0), status_by_id)
+        self.assertFalse(buffer.full())
+
+
+class StatusUpdateManagerOutageTest(unittest.TestCase):
+    def setUp(self):
+        sleep_patcher = mock.patch.object(db2_processor.time, 'sleep')
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+        self.db = mock.MagicMock()
+        self.cursor = self.db.get_cursor.return_value.__enter__.return_value
+        self.manager = StatusUpdateManager(
+            db=self.db,
+            table_name='T',
+            queue_size=10,
+            update_status=True,
+            batch_size=16
+        )
+        self.addCleanup(self.manager.stop)
+
+    def _run_outage(self, failures_before_stop, failures_after_stop=None):
+        """Fails failures_before_stop MERGEs, the last once stop() closed the buffer, then failures_after_stop more"""
+        calls = []
+        stopping = threading.Event()
+        stopped = threading.Event()
+
+        def execute(sql, params):
+            calls.append(params)
+            if len(calls) == failures_before_stop:
+                stopping.set()
+                while not self.manager.queue.closed:
+                    stopped.wait(0.01)
+            if failures_after_stop is None or len(calls) <= failures_before_stop + failures_after_stop:
+                raise RuntimeError("MERGE failed")
+
+        self.cursor.execute.side_effect = execute
+        self.manager.start()
+        self.manager.queue_update(StatusUpdate([1, 2, 3], ProcessingStatus.COMPLETED))
+        self.assertTrue(stopping.wait(timeout=10))
+        self.manager.stop()
+        return calls
+
+    def test_outage_spanning_stop_keeps_updates(self):
+        failures_before_stop = StatusUpdateManager.MAX_FAILED_ROUNDS + 1
+        # Only the failures once stop() closed the buffer count, MAX_FAILED_ROUNDS - 1 of them
+        failures_after_stop = StatusUpdateManager.MAX_FAILED_ROUNDS - 2
+        calls = self._run_outage(failures_before_stop, failures_after_stop)
+
+        self.assertEqual(len(calls), failures_before_stop + failures_after_stop + 1)
+        self.assertEqual(calls[-1][:6], [1, 'completed', 2, 'completed', 3, 'completed'])
+
+    def test_outage_after_stop_drops_after_max_failed_rounds(self):
+        calls = self._run_outage(failures_before_stop=2)
+
+        # The round failing while stop() closes the buffer is the first one counted
+        self.assertEqual(len(calls), 1 + StatusUpdateManager.MAX_FAILED_ROUNDS)
+        self.assertFalse(self.manager.update_thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()